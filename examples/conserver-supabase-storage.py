@@ -7,6 +7,10 @@ interface and handles Redis caching automatically.
 
 Installation:
     pip install supabase redis
+    pip install orjson  # optional, faster cache (de)serialization
+    pip install zstandard  # optional, compresses large cached vCons
+    pip install cachetools  # optional, in-process cache in front of Redis
+    pip install "psycopg[binary]"  # optional, COPY-based bulk_import()
 
 Usage in config.yml:
     storages:
@@ -15,30 +19,76 @@ Usage in config.yml:
         options:
           url: ${SUPABASE_URL}
           anon_key: ${SUPABASE_ANON_KEY}
+          # Optional direct Postgres URL, only used by bulk_import()
+          db_url: ${SUPABASE_DB_URL}
           # Optional Redis cache configuration
           redis_url: ${REDIS_URL}
           cache_ttl: 3600  # 1 hour in seconds
+          redis_max_connections: 32  # Shared pool size across worker threads
+          # Optional in-process cache in front of Redis (requires cachetools).
+          # Not invalidated across workers: another worker's save or delete
+          # can stay invisible for up to local_cache_ttl seconds.
+          local_cache_max_bytes: 0  # e.g. 52428800 (50 MiB); 0 disables
+          local_cache_ttl: 60  # seconds
+          # Optional Bloom filter of saved uuids (requires RedisBloom)
+          bloom_filter: false
+          bloom_capacity: 1000000
 
 Configuration:
     - SUPABASE_URL: Your Supabase project URL
     - SUPABASE_ANON_KEY: Your Supabase anon/service role key
+    - SUPABASE_DB_URL: Direct/pooler Postgres URL (optional, for bulk_import)
     - REDIS_URL: Redis connection URL (optional, for caching)
     - VCON_REDIS_EXPIRY: Cache TTL in seconds (default 3600)
+
+AsyncSupabaseStorage offers the same operations as coroutines, built on
+supabase-py's async client and redis.asyncio, for asyncio-based workers.
+
+Saves are sent as a single transactional call to the save_vcon RPC
+(supabase/migrations/20261015000000_save_vcon_rpc.sql). Against a database
+without that function, each table is upserted separately instead. Likewise,
+search() reads assembled documents from the vcons_full view when it exists.
+
+With bloom_filter enabled, every uuid saved through this storage is added to
+a Redis Bloom filter and get() answers a cache miss for a uuid the filter has
+never seen with None, without querying Supabase. Only enable it when all
+vCons are written through this storage (or the filter has been seeded with
+every existing uuid); vCons written by other clients would otherwise be
+reported as missing. A save fails if Redis cannot record its uuid.
+
+The filter is only trusted while it exists. If it is lost (Redis restart
+without persistence, FLUSHDB, eviction), get() falls back to Supabase and
+saves stop adding to it; it is only recreated empty while the vcons table is
+empty. To rebuild it for existing data, create it with BF.RESERVE and add
+every stored uuid while no saves are running.
 """
 
 import os
 import json
+import socket
+import asyncio
 import logging
+import itertools
+import threading
+from operator import itemgetter
 from typing import Optional, Dict, Any, List
-from datetime import datetime
+from datetime import datetime, timezone
 
 try:
     from supabase import create_client, Client
+    from postgrest.exceptions import APIError
+    from postgrest.types import CountMethod, ReturnMethod
     SUPABASE_AVAILABLE = True
 except ImportError:
     SUPABASE_AVAILABLE = False
     logging.warning("supabase-py not installed. Install with: pip install supabase")
 
+try:
+    from supabase import acreate_client, AsyncClient
+    ASYNC_SUPABASE_AVAILABLE = True
+except ImportError:
+    ASYNC_SUPABASE_AVAILABLE = False
+
 try:
     import redis
     REDIS_AVAILABLE = True
@@ -46,14 +96,166 @@ except ImportError:
     REDIS_AVAILABLE = False
     logging.info("redis not installed. Caching disabled. Install with: pip install redis")
 
+try:
+    import redis.asyncio as aioredis
+    ASYNC_REDIS_AVAILABLE = True
+except ImportError:
+    ASYNC_REDIS_AVAILABLE = False
+
+try:
+    import orjson
+    
+    # orjson reads and writes bytes, matching the raw Redis replies
+    _json_dumps = orjson.dumps
+    _json_loads = orjson.loads
+except ImportError:
+    _json_dumps = json.dumps
+    _json_loads = json.loads
+
+try:
+    import psycopg
+    from psycopg import sql
+    from psycopg.types.json import Jsonb
+    PSYCOPG_AVAILABLE = True
+except ImportError:
+    PSYCOPG_AVAILABLE = False
+
+try:
+    from cachetools import TTLCache
+    CACHETOOLS_AVAILABLE = True
+except ImportError:
+    CACHETOOLS_AVAILABLE = False
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+# Redis key prefix; keys are built by concatenation, the cheapest form
+CACHE_KEY_PREFIX = 'vcon:'
+
+# Redis Bloom filter of uuids saved through the storage (bloom_filter option)
+BLOOM_FILTER_KEY = 'vcons:bloom'
+BLOOM_FILTER_ERROR_RATE = 0.001
+
+# Cached vCons at least this large (serialized) are stored zstd-compressed
+CACHE_COMPRESS_MIN_BYTES = 1024
+
+# Every zstd frame starts with this magic number; JSON text never does, so
+# plain and compressed cache values can be told apart on read
+_ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+
+# zstd (de)compressor objects are not thread-safe; keep one pair per thread
+_zstd_local = threading.local()
+
+# Select a vCon row together with all of its child rows in one request
+VCON_EMBED_SELECT = '*, parties(*), dialog(*), analysis(*), attachments(*)'
+
+# PostgREST error codes for a missing table or view (PostgREST 12+, older)
+_MISSING_RELATION_CODES = frozenset(('PGRST205', '42P01'))
+
+
+def _zstd_contexts():
+    """Return this thread's (compressor, decompressor) pair."""
+    contexts = getattr(_zstd_local, 'contexts', None)
+    if contexts is None:
+        contexts = (zstandard.ZstdCompressor(level=3), zstandard.ZstdDecompressor())
+        _zstd_local.contexts = contexts
+    return contexts
+
+
+def _encode_cache_value(vcon: Dict[str, Any]):
+    """Serialize a vCon for Redis, compressing it when large."""
+    data = _json_dumps(vcon)
+    if ZSTD_AVAILABLE and len(data) >= CACHE_COMPRESS_MIN_BYTES:
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        return _zstd_contexts()[0].compress(data)
+    return data
+
+
+def _decode_cache_value(value: bytes) -> Dict[str, Any]:
+    """Deserialize a Redis value written by _encode_cache_value."""
+    if value[:4] == _ZSTD_MAGIC:
+        if not ZSTD_AVAILABLE:
+            raise ValueError("cached vCon is zstd-compressed but zstandard is not installed")
+        value = _zstd_contexts()[1].decompress(value)
+    return _json_loads(value)
+
+
+# JSONB columns per table; COPY needs these values wrapped explicitly
+_JSONB_COLUMNS = {
+    'vcons': frozenset(('redacted', 'amended')),
+    'parties': frozenset(('jcard', 'civicaddress')),
+    'dialog': frozenset(('session_id',)),
+}
+
+
+def _copy_rows(cursor, table: str, rows) -> int:
+    """Stream row dicts into a table with COPY; returns the row count."""
+    rows = iter(rows)
+    first = next(rows, None)
+    if first is None:
+        return 0
+    
+    columns = list(first)
+    jsonb_columns = _JSONB_COLUMNS.get(table, frozenset())
+    statement = sql.SQL("COPY {} ({}) FROM STDIN").format(
+        sql.Identifier(table),
+        sql.SQL(', ').join(map(sql.Identifier, columns)),
+    )
+    
+    count = 0
+    with cursor.copy(statement) as copy:
+        for row in itertools.chain((first,), rows):
+            values = []
+            for column in columns:
+                value = row[column]
+                if value is not None:
+                    if column in jsonb_columns:
+                        value = Jsonb(value)
+                    elif column == 'body' and not isinstance(value, str):
+                        # Non-string bodies (objects, arrays) are stored as
+                        # JSON text, as the save_vcon RPC and serializeBody do
+                        value = json.dumps(value)
+                values.append(value)
+            copy.write_row(values)
+            count += 1
+    return count
+
+
+def _apply_search_filters(table, query: Dict[str, Any]):
+    """Apply search() criteria to a vcons or vcons_full select."""
+    if 'subject' in query:
+        table = table.ilike('subject', f"%{query['subject']}%")
+    
+    if 'start_date' in query:
+        table = table.gte('created_at', query['start_date'])
+    
+    if 'end_date' in query:
+        table = table.lte('created_at', query['end_date'])
+    
+    return table
+
+
+def _keepalive_options() -> Dict[int, int]:
+    """TCP keep-alive tuning so pooled connections survive idle load balancers."""
+    options = {}
+    # Not every platform exposes these (e.g. TCP_KEEPIDLE is Linux-only)
+    for name, value in (('TCP_KEEPIDLE', 60), ('TCP_KEEPINTVL', 15), ('TCP_KEEPCNT', 4)):
+        if hasattr(socket, name):
+            options[getattr(socket, name)] = value
+    return options
+
 
 class SupabaseStorage:
     """
     Supabase storage backend for conserver.
     
-    Stores vCons in Supabase PostgreSQL and optionally caches in Redis.
-    Implements write-through cache pattern: writes go to Supabase first,
-    then Redis cache for fast reads.
+    Stores vCons in Supabase PostgreSQL and optionally caches in Redis,
+    fronted by a small in-process cache. Implements write-through cache
+    pattern: writes go to Supabase first, then the caches for fast reads.
     """
     
     def __init__(self, options: Dict[str, Any]):
@@ -64,8 +266,18 @@ class SupabaseStorage:
             options: Configuration dict with keys:
                 - url: Supabase project URL
                 - anon_key: Supabase API key
+                - db_url: Optional direct Postgres URL for bulk_import()
                 - redis_url: Optional Redis URL for caching
                 - cache_ttl: Optional cache TTL in seconds (default 3600)
+                - redis_max_connections: Optional Redis pool size (default 32)
+                - local_cache_max_bytes: Optional in-process cache size
+                  (default 0, disabled)
+                - local_cache_ttl: Optional in-process cache TTL in seconds
+                  (default 60)
+                - bloom_filter: Optional; short-circuit lookups of unknown
+                  uuids with a Redis Bloom filter (default False)
+                - bloom_capacity: Optional Bloom filter capacity
+                  (default 1000000)
         """
         if not SUPABASE_AVAILABLE:
             raise ImportError("supabase-py is required. Install with: pip install supabase")
@@ -80,22 +292,49 @@ class SupabaseStorage:
             raise ValueError("SUPABASE_URL and SUPABASE_ANON_KEY are required")
         
         self.supabase: Client = create_client(url, key)
+        # Bound once; every query starts from a fresh builder off this method
+        self._table = self.supabase.table
+        self._save_rpc_available = True
+        self._full_view_available = True
+        self.db_url = options.get('db_url') or os.getenv('SUPABASE_DB_URL')
         self.logger.info("✅ Connected to Supabase")
         
         # Optional Redis cache
         self.redis_client = None
         self.cache_enabled = False
+        self.bloom_enabled = False
         self.cache_ttl = int(options.get('cache_ttl', os.getenv('VCON_REDIS_EXPIRY', '3600')))
         
+        # Optional in-process cache in front of Redis. It holds the encoded
+        # cache value, so every hit decodes a fresh dict that callers may
+        # mutate. Entries are not invalidated across processes, so it is
+        # opt-in and uses a short default TTL.
+        self.local_cache = None
+        self._local_cache_lock = threading.RLock()
+        local_max_bytes = int(options.get('local_cache_max_bytes', 0))
+        if local_max_bytes > 0 and CACHETOOLS_AVAILABLE:
+            self.local_cache = TTLCache(
+                maxsize=local_max_bytes,
+                ttl=int(options.get('local_cache_ttl', 60)),
+                getsizeof=len,
+            )
+        
         redis_url = options.get('redis_url') or os.getenv('REDIS_URL')
         if redis_url and REDIS_AVAILABLE:
             try:
-                self.redis_client = redis.from_url(
+                # Each worker thread borrows its own connection from a shared
+                # pool instead of queueing behind a single socket. Replies stay
+                # as raw bytes so cached values go straight to the JSON decoder.
+                pool = redis.BlockingConnectionPool.from_url(
                     redis_url,
-                    decode_responses=True,
+                    max_connections=int(options.get('redis_max_connections', 32)),
+                    timeout=5,
                     socket_connect_timeout=5,
-                    socket_timeout=5
+                    socket_timeout=5,
+                    socket_keepalive=True,
+                    socket_keepalive_options=_keepalive_options(),
                 )
+                self.redis_client = redis.Redis(connection_pool=pool)
                 self.redis_client.ping()
                 self.cache_enabled = True
                 self.logger.info(f"✅ Redis cache enabled (TTL: {self.cache_ttl}s)")
@@ -104,6 +343,9 @@ class SupabaseStorage:
                 self.redis_client = None
         else:
             self.logger.info("ℹ️  Redis cache disabled (not configured)")
+        
+        if self.cache_enabled and options.get('bloom_filter'):
+            self._init_bloom_filter(int(options.get('bloom_capacity', 1000000)))
     
     def save(self, vcon: Dict[str, Any]) -> bool:
         """
@@ -114,6 +356,9 @@ class SupabaseStorage:
         2. Write to Redis (cache)
         3. Return success only if Supabase write succeeds
         
+        With bloom_filter enabled, the uuid is added to the Bloom filter
+        first, so the save also fails when Redis is unreachable.
+        
         Args:
             vcon: vCon dictionary
             
@@ -124,73 +369,109 @@ class SupabaseStorage:
             uuid = vcon.get('uuid')
             if not uuid:
                 raise ValueError("vCon must have a uuid field")
+            self._bloom_add([uuid])
+            self._save_to_supabase(vcon)
             
-            # Prepare vCon data for Supabase schema
-            vcon_data = {
-                'uuid': uuid,
-                'vcon_version': vcon.get('vcon', '0.3.0'),
-                'subject': vcon.get('subject'),
-                'created_at': vcon.get('created_at', datetime.utcnow().isoformat()),
-                'updated_at': vcon.get('updated_at', datetime.utcnow().isoformat()),
-                'extensions': vcon.get('extensions'),
-                'must_support': vcon.get('must_support'),
-                'redacted': vcon.get('redacted', {}),
-                'appended': vcon.get('appended', {}),
-            }
-            
-            # Insert or update main vCon record
-            result = self.supabase.table('vcons').upsert(vcon_data).execute()
-            
-            if not result.data:
-                raise Exception("Failed to save vCon to Supabase")
-            
-            vcon_id = result.data[0]['id']
-            
-            # Save parties
-            if 'parties' in vcon and vcon['parties']:
-                self._save_parties(vcon_id, vcon['parties'])
-            
-            # Save dialog
-            if 'dialog' in vcon and vcon['dialog']:
-                self._save_dialog(vcon_id, vcon['dialog'])
-            
-            # Save analysis
-            if 'analysis' in vcon and vcon['analysis']:
-                self._save_analysis(vcon_id, vcon['analysis'])
-            
-            # Save attachments
-            if 'attachments' in vcon and vcon['attachments']:
-                self._save_attachments(vcon_id, vcon['attachments'])
-            
-            self.logger.info(f"✅ Saved vCon {uuid} to Supabase")
+            self.logger.info("✅ Saved vCon %s to Supabase", uuid)
             
             # Cache in Redis after successful Supabase write
-            if self.cache_enabled and self.redis_client:
-                try:
-                    self.redis_client.setex(
-                        f"vcon:{uuid}",
-                        self.cache_ttl,
-                        json.dumps(vcon)
-                    )
-                    self.logger.debug(f"✅ Cached vCon {uuid} in Redis")
-                except Exception as e:
-                    self.logger.warning(f"⚠️  Failed to cache vCon {uuid}: {e}")
-                    # Non-fatal: continue without caching
+            self._cache_many([vcon])
             
             return True
             
         except Exception as e:
-            self.logger.error(f"❌ Failed to save vCon: {e}")
+            self.logger.error("❌ Failed to save vCon: %s", e)
             return False
     
+    def save_many(self, vcons: List[Dict[str, Any]]) -> bool:
+        """
+        Save several vCons to Supabase and cache them in one Redis round trip.
+        
+        Each vCon is written to Supabase independently; only those that were
+        stored successfully are cached, so the next get() of any of them is
+        a cache hit.
+        
+        Args:
+            vcons: List of vCon dictionaries
+            
+        Returns:
+            bool: True if every save succeeded
+        """
+        try:
+            self._bloom_add([vcon['uuid'] for vcon in vcons if vcon.get('uuid')])
+        except Exception as e:
+            self.logger.error("❌ Failed to save %s vCons: %s", len(vcons), e)
+            return False
+        
+        saved = []
+        for vcon in vcons:
+            try:
+                self._save_to_supabase(vcon)
+                saved.append(vcon)
+            except Exception as e:
+                self.logger.error("❌ Failed to save vCon %s: %s", vcon.get('uuid'), e)
+        
+        self.logger.info("✅ Saved %s/%s vCons to Supabase", len(saved), len(vcons))
+        self._cache_many(saved)
+        return len(saved) == len(vcons)
+    
+    def bulk_import(self, vcons: List[Dict[str, Any]]) -> int:
+        """
+        Load new vCons in bulk with PostgreSQL COPY.
+        
+        Bypasses PostgREST and streams rows for all five tables over a direct
+        Postgres connection (db_url / SUPABASE_DB_URL) in one transaction, so
+        the import lands completely or not at all. Child rows reference the
+        vCon uuid, so no ids need to be read back between tables.
+        
+        COPY inserts only: importing a vCon whose uuid already exists fails
+        the whole batch. Use save_many() to update existing vCons.
+        
+        Imported vCons are written to the cache afterwards, so reads right
+        after an import do not all miss.
+        
+        Args:
+            vcons: List of vCon dictionaries
+            
+        Returns:
+            int: Number of vCons imported
+        """
+        if not PSYCOPG_AVAILABLE:
+            raise ImportError("psycopg is required for bulk_import. Install with: pip install \"psycopg[binary]\"")
+        if not self.db_url:
+            raise ValueError("db_url or SUPABASE_DB_URL is required for bulk_import")
+        if any(not vcon.get('uuid') for vcon in vcons):
+            raise ValueError("vCon must have a uuid field")
+        
+        tables = (
+            ('vcons', lambda v: [self._vcon_row(v)]),
+            ('parties', lambda v: self._party_rows(v['uuid'], v.get('parties') or [])),
+            ('dialog', lambda v: self._dialog_rows(v['uuid'], v.get('dialog') or [])),
+            ('analysis', lambda v: self._analysis_rows(v['uuid'], v.get('analysis') or [])),
+            ('attachments', lambda v: self._attachment_rows(v['uuid'], v.get('attachments') or [])),
+        )
+        
+        self._bloom_add([vcon['uuid'] for vcon in vcons])
+        
+        with psycopg.connect(self.db_url) as conn:
+            with conn.cursor() as cursor:
+                for table, build_rows in tables:
+                    count = _copy_rows(cursor, table, (row for vcon in vcons for row in build_rows(vcon)))
+                    self.logger.debug("Copied %s row(s) into %s", count, table)
+        
+        self.logger.info("✅ Bulk imported %s vCons", len(vcons))
+        self._cache_many(vcons)
+        return len(vcons)
+    
     def get(self, uuid: str) -> Optional[Dict[str, Any]]:
         """
         Get a vCon by UUID (cache-first strategy).
         
         Read-through pattern:
-        1. Check Redis cache first
-        2. If cache miss, fetch from Supabase
-        3. Cache the result in Redis
+        1. Check the in-process cache, then Redis
+        2. If cache miss, fetch from Supabase (skipped when the Bloom filter
+           has never seen the uuid)
+        3. Cache the result in both tiers
         
         Args:
             uuid: vCon UUID
@@ -199,62 +480,99 @@ class SupabaseStorage:
             Dict or None if not found
         """
         # Try cache first
+        local = self._local_get(uuid)
+        if local is not None:
+            return _decode_cache_value(local)
+        
         if self.cache_enabled and self.redis_client:
             try:
-                cached = self.redis_client.get(f"vcon:{uuid}")
+                cached = self.redis_client.get(CACHE_KEY_PREFIX + uuid)
                 if cached:
-                    self.logger.debug(f"✅ Cache HIT for vCon {uuid}")
-                    return json.loads(cached)
-                self.logger.debug(f"ℹ️  Cache MISS for vCon {uuid}")
+                    self.logger.debug("Cache HIT for vCon %s", uuid)
+                    self._local_put(uuid, cached)
+                    return _decode_cache_value(cached)
+                self.logger.debug("Cache MISS for vCon %s", uuid)
+                if self.bloom_enabled and self._bloom_rules_out(uuid):
+                    self.logger.debug("vCon %s not in Bloom filter", uuid)
+                    return None
             except Exception as e:
-                self.logger.warning(f"⚠️  Cache read error for {uuid}: {e}")
+                self.logger.warning("⚠️  Cache read error for %s: %s", uuid, e)
         
         # Cache miss or cache disabled - fetch from Supabase
         try:
-            result = self.supabase.table('vcons').select('*').eq('uuid', uuid).single().execute()
+            # One request returns the vCon row with all child rows embedded
+            result = (
+                self._table('vcons')
+                .select(VCON_EMBED_SELECT)
+                .eq('uuid', uuid)
+                .single()
+                .execute()
+            )
             
             if not result.data:
                 return None
             
-            vcon_data = result.data
-            vcon_id = vcon_data['id']
-            
-            # Reconstruct full vCon
-            vcon = {
-                'vcon': vcon_data['vcon_version'],
-                'uuid': vcon_data['uuid'],
-                'created_at': vcon_data['created_at'],
-                'updated_at': vcon_data['updated_at'],
-                'subject': vcon_data['subject'],
-                'extensions': vcon_data.get('extensions'),
-                'must_support': vcon_data.get('must_support'),
-                'redacted': vcon_data.get('redacted', {}),
-                'appended': vcon_data.get('appended', {}),
-            }
-            
-            # Get related entities
-            vcon['parties'] = self._get_parties(vcon_id)
-            vcon['dialog'] = self._get_dialog(vcon_id)
-            vcon['analysis'] = self._get_analysis(vcon_id)
-            vcon['attachments'] = self._get_attachments(vcon_id)
+            vcon = self._vcon_from_db(result.data)
             
             # Cache for future reads
-            if self.cache_enabled and self.redis_client:
-                try:
-                    self.redis_client.setex(
-                        f"vcon:{uuid}",
-                        self.cache_ttl,
-                        json.dumps(vcon)
-                    )
-                except Exception as e:
-                    self.logger.warning(f"⚠️  Failed to cache vCon {uuid}: {e}")
+            self._cache_many([vcon])
             
             return vcon
             
         except Exception as e:
-            self.logger.error(f"❌ Failed to get vCon {uuid}: {e}")
+            self.logger.error("❌ Failed to get vCon %s: %s", uuid, e)
             return None
     
+    def get_many(self, uuids: List[str]) -> List[Dict[str, Any]]:
+        """
+        Get several vCons by UUID (cache-first strategy).
+        
+        The in-process cache is checked first, then all remaining lookups are
+        issued as a single MGET; the misses are fetched from Supabase in one
+        request and written back to the cache.
+        
+        Args:
+            uuids: vCon UUIDs
+            
+        Returns:
+            List of found vCons, in the order requested
+        """
+        found: Dict[str, Dict[str, Any]] = {}
+        for uuid in uuids:
+            local = self._local_get(uuid)
+            if local is not None:
+                found[uuid] = _decode_cache_value(local)
+        
+        pending = [uuid for uuid in uuids if uuid not in found]
+        if self.cache_enabled and self.redis_client and pending:
+            try:
+                cached = self.redis_client.mget([CACHE_KEY_PREFIX + uuid for uuid in pending])
+                for uuid, value in zip(pending, cached):
+                    if value:
+                        self._local_put(uuid, value)
+                        found[uuid] = _decode_cache_value(value)
+                self.logger.debug("Cache HIT for %s/%s vCons", len(found), len(uuids))
+            except Exception as e:
+                self.logger.warning("⚠️  Cache read error for bulk get: %s", e)
+        
+        misses = [uuid for uuid in uuids if uuid not in found]
+        if misses:
+            try:
+                result = (
+                    self._table('vcons')
+                    .select(VCON_EMBED_SELECT)
+                    .in_('uuid', misses)
+                    .execute()
+                )
+                fetched = [self._vcon_from_db(row) for row in result.data]
+                self._cache_many(fetched)
+                for vcon in fetched:
+                    found[vcon['uuid']] = vcon
+            except Exception as e:
+                self.logger.error("❌ Failed to get vCons: %s", e)
+        
+        return [found[uuid] for uuid in uuids if uuid in found]
+    
     def delete(self, uuid: str) -> bool:
         """
         Delete a vCon from Supabase and cache.
@@ -267,26 +585,34 @@ class SupabaseStorage:
         """
         try:
             # Delete from Supabase (cascades to related tables)
-            self.supabase.table('vcons').delete().eq('uuid', uuid).execute()
+            self._table('vcons').delete().eq('uuid', uuid).execute()
             
-            # Invalidate cache
+            self._local_pop(uuid)
+            
+            # Invalidate cache. UNLINK frees large values in the background
+            # instead of blocking Redis the way DEL does.
             if self.cache_enabled and self.redis_client:
                 try:
-                    self.redis_client.delete(f"vcon:{uuid}")
+                    self.redis_client.unlink(CACHE_KEY_PREFIX + uuid)
                 except Exception as e:
-                    self.logger.warning(f"⚠️  Failed to invalidate cache for {uuid}: {e}")
+                    self.logger.warning("⚠️  Failed to invalidate cache for %s: %s", uuid, e)
             
-            self.logger.info(f"✅ Deleted vCon {uuid}")
+            self.logger.info("✅ Deleted vCon %s", uuid)
             return True
             
         except Exception as e:
-            self.logger.error(f"❌ Failed to delete vCon {uuid}: {e}")
+            self.logger.error("❌ Failed to delete vCon %s: %s", uuid, e)
             return False
     
     def search(self, query: Dict[str, Any]) -> List[Dict[str, Any]]:
         """
         Search vCons by criteria.
         
+        Matching vCons are read as finished documents from the vcons_full
+        view (supabase/migrations/20261015000100_vcons_full_view.sql), so
+        they are assembled in Postgres. Without that view, the vCons and
+        their child rows are fetched with one embedded select instead.
+        
         Args:
             query: Search criteria dict
             
@@ -294,39 +620,292 @@ class SupabaseStorage:
             List of matching vCons
         """
         try:
-            table = self.supabase.table('vcons')
-            
-            # Apply filters
-            if 'subject' in query:
-                table = table.ilike('subject', f"%{query['subject']}%")
-            
-            if 'start_date' in query:
-                table = table.gte('created_at', query['start_date'])
-            
-            if 'end_date' in query:
-                table = table.lte('created_at', query['end_date'])
-            
-            result = table.select('uuid').execute()
-            
-            # Fetch full vCons
-            vcons = []
-            for row in result.data:
-                vcon = self.get(row['uuid'])
-                if vcon:
-                    vcons.append(vcon)
-            
+            vcons = self._search_vcons(query)
+            self._cache_many(vcons)
             return vcons
             
         except Exception as e:
-            self.logger.error(f"❌ Search failed: {e}")
+            self.logger.error("❌ Search failed: %s", e)
             return []
     
+    def _search_vcons(self, query: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Run a search against vcons_full, falling back to an embedded select."""
+        if self._full_view_available:
+            try:
+                result = _apply_search_filters(self._table('vcons_full').select('vcon'), query).execute()
+                return [row['vcon'] for row in result.data]
+            except APIError as e:
+                if e.code not in _MISSING_RELATION_CODES:
+                    raise
+                # View not found: the vcons_full migration is not applied
+                self._full_view_available = False
+                self.logger.warning("⚠️  vcons_full view not found; falling back to embedded selects")
+        
+        result = _apply_search_filters(self._table('vcons').select(VCON_EMBED_SELECT), query).execute()
+        return [self._vcon_from_db(row) for row in result.data]
+    
+    # Helper methods for the Redis cache
+    
+    def _cache_many(self, vcons: List[Dict[str, Any]]):
+        """Write vCons to both cache tiers, using one pipelined Redis round trip."""
+        redis_enabled = self.cache_enabled and self.redis_client
+        if not vcons or not (redis_enabled or self.local_cache is not None):
+            return
+        try:
+            encoded = [(vcon['uuid'], _encode_cache_value(vcon)) for vcon in vcons]
+            for uuid, value in encoded:
+                self._local_put(uuid, value)
+            if not redis_enabled:
+                return
+            with self.redis_client.pipeline(transaction=False) as pipe:
+                for uuid, value in encoded:
+                    pipe.setex(CACHE_KEY_PREFIX + uuid, self.cache_ttl, value)
+                pipe.execute()
+            self.logger.debug("Cached %s vCon(s) in Redis", len(vcons))
+        except Exception as e:
+            # Non-fatal: continue without caching
+            self.logger.warning("⚠️  Failed to cache %s vCon(s): %s", len(vcons), e)
+    
+    def _init_bloom_filter(self, capacity: int):
+        """
+        Enable the Bloom filter, creating it only while no vCon is stored.
+        
+        An empty filter is only complete for an empty vcons table, so a filter
+        that was lost is never recreated empty; get() ignores a missing filter
+        until it is seeded. Stays disabled without RedisBloom.
+        """
+        try:
+            # Fails with an unknown-command error when RedisBloom is missing
+            self.redis_client.execute_command('BF.EXISTS', BLOOM_FILTER_KEY, '')
+            if not self.redis_client.exists(BLOOM_FILTER_KEY):
+                if self._table('vcons').select('uuid').limit(1).execute().data:
+                    self.logger.warning(
+                        f"⚠️  Bloom filter {BLOOM_FILTER_KEY} not found and vcons is not empty; "
+                        "lookups will not be short-circuited until it is seeded."
+                    )
+                else:
+                    self._reserve_bloom_filter(capacity)
+        except Exception as e:
+            self.logger.warning(f"⚠️  Bloom filter unavailable: {e}. Lookups will not be short-circuited.")
+            return
+        self.bloom_enabled = True
+        self.logger.info(f"✅ Bloom filter enabled ({BLOOM_FILTER_KEY})")
+    
+    def _reserve_bloom_filter(self, capacity: int):
+        """Create the Bloom filter, tolerating another worker creating it first."""
+        try:
+            self.redis_client.execute_command(
+                'BF.RESERVE', BLOOM_FILTER_KEY, BLOOM_FILTER_ERROR_RATE, capacity
+            )
+        except redis.ResponseError as e:
+            if 'exists' not in str(e).lower():
+                raise
+    
+    def _bloom_rules_out(self, uuid: str) -> bool:
+        """True only if the Bloom filter exists and has never seen the uuid."""
+        with self.redis_client.pipeline(transaction=False) as pipe:
+            pipe.exists(BLOOM_FILTER_KEY)
+            pipe.execute_command('BF.EXISTS', BLOOM_FILTER_KEY, uuid)
+            present, known = pipe.execute()
+        # BF.EXISTS on a missing key also returns 0, which must not count
+        return bool(present) and not known
+    
+    def _bloom_add(self, uuids: List[str]):
+        """
+        Record uuids in the Bloom filter ahead of writing them to Supabase.
+        
+        Adding first means a concurrent get() never sees a stored vCon that
+        the filter does not know; a failed save only leaves a false positive.
+        Errors propagate so the save fails: every worker trusts the shared
+        filter, so a vCon stored without its uuid in it would read as missing.
+        
+        NOCREATE keeps a lost filter from being recreated here with default
+        sizing and without the uuids it held. A missing filter is not
+        consulted by get(), so the save can go ahead without it.
+        """
+        if not (self.bloom_enabled and uuids):
+            return
+        try:
+            self.redis_client.execute_command(
+                'BF.INSERT', BLOOM_FILTER_KEY, 'NOCREATE', 'ITEMS', *uuids
+            )
+        except redis.ResponseError as e:
+            if 'not found' not in str(e).lower():
+                raise
+            self.logger.warning("⚠️  Bloom filter %s not found; not recording %s uuid(s)", BLOOM_FILTER_KEY, len(uuids))
+    
+    def _local_get(self, uuid: str):
+        """Return the encoded vCon from the in-process cache, or None."""
+        if self.local_cache is None:
+            return None
+        with self._local_cache_lock:
+            return self.local_cache.get(uuid)
+    
+    def _local_put(self, uuid: str, value):
+        """Store an encoded vCon in the in-process cache."""
+        if self.local_cache is None:
+            return
+        with self._local_cache_lock:
+            try:
+                self.local_cache[uuid] = value
+            except ValueError:
+                # Larger than the whole cache; leave it to Redis
+                pass
+    
+    def _local_pop(self, uuid: str):
+        """Drop a vCon from the in-process cache."""
+        if self.local_cache is None:
+            return
+        with self._local_cache_lock:
+            self.local_cache.pop(uuid, None)
+    
     # Helper methods for saving related entities
     
+    def _save_to_supabase(self, vcon: Dict[str, Any]) -> None:
+        """
+        Write a vCon and its child entities to Supabase; raises on failure.
+        
+        Uses the save_vcon RPC, which upserts every table in one request and
+        one transaction. Databases without that function fall back to
+        per-table upserts.
+        """
+        uuid = vcon.get('uuid')
+        if not uuid:
+            raise ValueError("vCon must have a uuid field")
+        
+        if self._save_rpc_available:
+            try:
+                self.supabase.rpc('save_vcon', {'payload': vcon}).execute()
+                return
+            except APIError as e:
+                if e.code != 'PGRST202':
+                    raise
+                # Function not found: the save_vcon migration is not applied
+                self._save_rpc_available = False
+                self.logger.warning("⚠️  save_vcon RPC not found; falling back to per-table upserts")
+        
+        self._save_tables(vcon)
+    
+    def _save_tables(self, vcon: Dict[str, Any]) -> None:
+        """
+        Write a vCon with one upsert per table (non-atomic fallback).
+        
+        The vcons id is the vCon uuid, so no upsert needs to return a row.
+        Like the save_vcon RPC, the vcons row is matched on uuid and an
+        existing row keeps its id.
+        """
+        vcon_id = vcon['uuid']
+        row = self._vcon_upsert_row(vcon)
+        
+        # Insert the main vCon record; an existing row is left alone here and
+        # updated without id below, since an upsert would rewrite its key
+        inserted = self._table('vcons').upsert(
+            row, on_conflict='uuid', ignore_duplicates=True,
+            returning=ReturnMethod.minimal, count=CountMethod.exact,
+        ).execute()
+        if not inserted.count:
+            del row['id']
+            self._table('vcons').update(row, returning=ReturnMethod.minimal).eq('uuid', vcon_id).execute()
+        
+        # Save parties
+        if 'parties' in vcon and vcon['parties']:
+            self._save_parties(vcon_id, vcon['parties'])
+        
+        # Save dialog
+        if 'dialog' in vcon and vcon['dialog']:
+            self._save_dialog(vcon_id, vcon['dialog'])
+        
+        # Save analysis
+        if 'analysis' in vcon and vcon['analysis']:
+            self._save_analysis(vcon_id, vcon['analysis'])
+        
+        # Save attachments
+        if 'attachments' in vcon and vcon['attachments']:
+            self._save_attachments(vcon_id, vcon['attachments'])
+    
     def _save_parties(self, vcon_id: str, parties: List[Dict[str, Any]]):
-        """Save parties to database."""
-        for idx, party in enumerate(parties):
-            party_data = {
+        """Save parties to database in a single bulk upsert."""
+        rows = self._party_rows(vcon_id, parties)
+        self._table('parties').upsert(
+            rows, on_conflict='vcon_id,party_index', returning=ReturnMethod.minimal
+        ).execute()
+    
+    def _save_dialog(self, vcon_id: str, dialogs: List[Dict[str, Any]]):
+        """Save dialog to database in a single bulk upsert."""
+        rows = self._dialog_rows(vcon_id, dialogs)
+        self._table('dialog').upsert(
+            rows, on_conflict='vcon_id,dialog_index', returning=ReturnMethod.minimal
+        ).execute()
+    
+    def _save_analysis(self, vcon_id: str, analyses: List[Dict[str, Any]]):
+        """Save analysis to database in a single bulk upsert."""
+        rows = self._analysis_rows(vcon_id, analyses)
+        self._table('analysis').upsert(
+            rows, on_conflict='vcon_id,analysis_index', returning=ReturnMethod.minimal
+        ).execute()
+    
+    def _save_attachments(self, vcon_id: str, attachments: List[Dict[str, Any]]):
+        """Save attachments to database in a single bulk upsert."""
+        rows = self._attachment_rows(vcon_id, attachments)
+        # Upsert uses the unique constraint on (vcon_id, attachment_index)
+        self._table('attachments').upsert(
+            rows, on_conflict='vcon_id,attachment_index', returning=ReturnMethod.minimal
+        ).execute()
+    
+    # Helper methods for building table rows from a vCon
+    
+    @staticmethod
+    def _vcon_row(vcon: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the vcons row for a vCon."""
+        # Read the clock once, and only when a timestamp is missing
+        created_at = vcon.get('created_at')
+        updated_at = vcon.get('updated_at')
+        if not (created_at and updated_at):
+            now = datetime.now(timezone.utc).isoformat()
+            created_at = created_at or now
+            updated_at = updated_at or now
+        
+        # Pre-0.4.0 documents use must_support/appended for critical/amended
+        critical = vcon.get('critical')
+        if critical is None:
+            critical = vcon.get('must_support')
+        amended = vcon.get('amended')
+        if amended is None:
+            amended = vcon.get('appended', {})
+        
+        # id mirrors uuid, as in the TypeScript batch writer and save_vcon RPC
+        return {
+            'id': vcon['uuid'],
+            'uuid': vcon['uuid'],
+            'vcon_version': vcon.get('vcon', '0.4.0'),
+            'subject': vcon.get('subject'),
+            'created_at': created_at,
+            'updated_at': updated_at,
+            'extensions': vcon.get('extensions'),
+            'critical': critical,
+            'redacted': vcon.get('redacted', {}),
+            'amended': amended,
+        }
+    
+    @classmethod
+    def _vcon_upsert_row(cls, vcon: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Build the vcons row for an upsert.
+        
+        Without a created_at in the vCon the column is left out, so an insert
+        uses the column default and an update keeps the stored value, as the
+        save_vcon RPC does.
+        """
+        row = cls._vcon_row(vcon)
+        if not vcon.get('created_at'):
+            del row['created_at']
+        return row
+    
+    @staticmethod
+    def _party_rows(vcon_id: str, parties: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Build parties rows for a vCon."""
+        return [
+            {
                 'vcon_id': vcon_id,
                 'party_index': idx,
                 'tel': party.get('tel'),
@@ -342,12 +921,14 @@ class SupabaseStorage:
                 'civicaddress': party.get('civicaddress'),
                 'timezone': party.get('timezone'),
             }
-            self.supabase.table('parties').upsert(party_data).execute()
+            for idx, party in enumerate(parties)
+        ]
     
-    def _save_dialog(self, vcon_id: str, dialogs: List[Dict[str, Any]]):
-        """Save dialog to database."""
-        for idx, dialog in enumerate(dialogs):
-            dialog_data = {
+    @staticmethod
+    def _dialog_rows(vcon_id: str, dialogs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Build dialog rows for a vCon."""
+        return [
+            {
                 'vcon_id': vcon_id,
                 'dialog_index': idx,
                 'type': dialog.get('type'),
@@ -366,17 +947,20 @@ class SupabaseStorage:
                 'application': dialog.get('application'),
                 'message_id': dialog.get('message_id'),
             }
-            self.supabase.table('dialog').upsert(dialog_data).execute()
+            for idx, dialog in enumerate(dialogs)
+        ]
     
-    def _save_analysis(self, vcon_id: str, analyses: List[Dict[str, Any]]):
-        """Save analysis to database."""
+    @staticmethod
+    def _analysis_rows(vcon_id: str, analyses: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Build analysis rows for a vCon."""
+        rows = []
         for idx, analysis in enumerate(analyses):
             # Normalize dialog field to array
             dialog_indices = analysis.get('dialog')
             if dialog_indices is not None and not isinstance(dialog_indices, list):
                 dialog_indices = [dialog_indices]
             
-            analysis_data = {
+            rows.append({
                 'vcon_id': vcon_id,
                 'analysis_index': idx,
                 'type': analysis.get('type'),
@@ -390,16 +974,18 @@ class SupabaseStorage:
                 'encoding': analysis.get('encoding'),
                 'url': analysis.get('url'),
                 'content_hash': analysis.get('content_hash'),
-            }
-            self.supabase.table('analysis').upsert(analysis_data).execute()
+            })
+        return rows
     
-    def _save_attachments(self, vcon_id: str, attachments: List[Dict[str, Any]]):
-        """Save attachments to database."""
-        for idx, attachment in enumerate(attachments):
-            attachment_data = {
+    @staticmethod
+    def _attachment_rows(vcon_id: str, attachments: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Build attachments rows for a vCon."""
+        return [
+            {
                 'vcon_id': vcon_id,
                 'attachment_index': idx,
                 'type': attachment.get('type'),
+                'purpose': attachment.get('purpose'),
                 'start_time': attachment.get('start'),
                 'party': attachment.get('party'),
                 'dialog': attachment.get('dialog'),
@@ -410,106 +996,416 @@ class SupabaseStorage:
                 'url': attachment.get('url'),
                 'content_hash': attachment.get('content_hash'),
             }
-            # Upsert will use the unique constraint on (vcon_id, attachment_index)
-            self.supabase.table('attachments').upsert(attachment_data).execute()
-    
-    # Helper methods for getting related entities
-    
-    def _get_parties(self, vcon_id: str) -> List[Dict[str, Any]]:
-        """Get parties from database."""
-        result = self.supabase.table('parties').select('*').eq('vcon_id', vcon_id).order('party_index').execute()
-        return [self._party_from_db(p) for p in result.data]
+            for idx, attachment in enumerate(attachments)
+        ]
     
-    def _get_dialog(self, vcon_id: str) -> List[Dict[str, Any]]:
-        """Get dialog from database."""
-        result = self.supabase.table('dialog').select('*').eq('vcon_id', vcon_id).order('dialog_index').execute()
-        return [self._dialog_from_db(d) for d in result.data]
-    
-    def _get_analysis(self, vcon_id: str) -> List[Dict[str, Any]]:
-        """Get analysis from database."""
-        result = self.supabase.table('analysis').select('*').eq('vcon_id', vcon_id).order('analysis_index').execute()
-        return [self._analysis_from_db(a) for a in result.data]
+    @classmethod
+    def _vcon_from_db(cls, row: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert a vcons row with embedded child rows (VCON_EMBED_SELECT) to a vCon dict."""
+        vcon = {
+            'vcon': row['vcon_version'],
+            'uuid': row['uuid'],
+            'created_at': row['created_at'],
+            'updated_at': row['updated_at'],
+            'subject': row['subject'],
+            'extensions': row.get('extensions'),
+            'critical': row.get('critical'),
+            'redacted': row.get('redacted', {}),
+            'amended': row.get('amended', {}),
+        }
+        
+        # Embedded resources are unordered; restore original array order
+        vcon['parties'] = [
+            cls._party_from_db(p)
+            for p in sorted(row.get('parties') or [], key=itemgetter('party_index'))
+        ]
+        vcon['dialog'] = [
+            cls._dialog_from_db(d)
+            for d in sorted(row.get('dialog') or [], key=itemgetter('dialog_index'))
+        ]
+        vcon['analysis'] = [
+            cls._analysis_from_db(a)
+            for a in sorted(row.get('analysis') or [], key=itemgetter('analysis_index'))
+        ]
+        vcon['attachments'] = [
+            cls._attachment_from_db(a)
+            for a in sorted(row.get('attachments') or [], key=itemgetter('attachment_index'))
+        ]
+        return vcon
     
-    def _get_attachments(self, vcon_id: str) -> List[Dict[str, Any]]:
-        """Get attachments from database."""
-        result = self.supabase.table('attachments').select('*').eq('vcon_id', vcon_id).order('attachment_index').execute()
-        return [self._attachment_from_db(a) for a in result.data]
+    # Row converters run once per child row on every read, so each field is
+    # looked up once and the code is kept straight-line. Generating them from
+    # field tables at import time (exec) was measured and is no faster.
     
     @staticmethod
     def _party_from_db(row: Dict[str, Any]) -> Dict[str, Any]:
         """Convert database row to party dict."""
+        get = row.get
         party = {}
-        if row.get('tel'): party['tel'] = row['tel']
-        if row.get('sip'): party['sip'] = row['sip']
-        if row.get('stir'): party['stir'] = row['stir']
-        if row.get('mailto'): party['mailto'] = row['mailto']
-        if row.get('name'): party['name'] = row['name']
-        if row.get('did'): party['did'] = row['did']
-        if row.get('uuid'): party['uuid'] = row['uuid']
-        if row.get('validation'): party['validation'] = row['validation']
-        if row.get('jcard'): party['jcard'] = row['jcard']
-        if row.get('gmlpos'): party['gmlpos'] = row['gmlpos']
-        if row.get('civicaddress'): party['civicaddress'] = row['civicaddress']
-        if row.get('timezone'): party['timezone'] = row['timezone']
+        v = get('tel')
+        if v: party['tel'] = v
+        v = get('sip')
+        if v: party['sip'] = v
+        v = get('stir')
+        if v: party['stir'] = v
+        v = get('mailto')
+        if v: party['mailto'] = v
+        v = get('name')
+        if v: party['name'] = v
+        v = get('did')
+        if v: party['did'] = v
+        v = get('uuid')
+        if v: party['uuid'] = v
+        v = get('validation')
+        if v: party['validation'] = v
+        v = get('jcard')
+        if v: party['jcard'] = v
+        v = get('gmlpos')
+        if v: party['gmlpos'] = v
+        v = get('civicaddress')
+        if v: party['civicaddress'] = v
+        v = get('timezone')
+        if v: party['timezone'] = v
         return party
     
     @staticmethod
     def _dialog_from_db(row: Dict[str, Any]) -> Dict[str, Any]:
         """Convert database row to dialog dict."""
+        get = row.get
         dialog = {'type': row['type']}
-        if row.get('start_time'): dialog['start'] = row['start_time']
-        if row.get('duration_seconds') is not None: dialog['duration'] = row['duration_seconds']
-        if row.get('parties'): dialog['parties'] = row['parties']
-        if row.get('originator') is not None: dialog['originator'] = row['originator']
-        if row.get('mediatype'): dialog['mediatype'] = row['mediatype']
-        if row.get('filename'): dialog['filename'] = row['filename']
-        if row.get('body'): dialog['body'] = row['body']
-        if row.get('encoding'): dialog['encoding'] = row['encoding']
-        if row.get('url'): dialog['url'] = row['url']
-        if row.get('content_hash'): dialog['content_hash'] = row['content_hash']
-        if row.get('disposition'): dialog['disposition'] = row['disposition']
-        if row.get('session_id'): dialog['session_id'] = row['session_id']
-        if row.get('application'): dialog['application'] = row['application']
-        if row.get('message_id'): dialog['message_id'] = row['message_id']
+        v = get('start_time')
+        if v: dialog['start'] = v
+        v = get('duration_seconds')
+        if v is not None: dialog['duration'] = v
+        v = get('parties')
+        if v: dialog['parties'] = v
+        v = get('originator')
+        if v is not None: dialog['originator'] = v
+        v = get('mediatype')
+        if v: dialog['mediatype'] = v
+        v = get('filename')
+        if v: dialog['filename'] = v
+        v = get('body')
+        if v: dialog['body'] = v
+        v = get('encoding')
+        if v: dialog['encoding'] = v
+        v = get('url')
+        if v: dialog['url'] = v
+        v = get('content_hash')
+        if v: dialog['content_hash'] = v
+        v = get('disposition')
+        if v: dialog['disposition'] = v
+        v = get('session_id')
+        if v: dialog['session_id'] = v
+        v = get('application')
+        if v: dialog['application'] = v
+        v = get('message_id')
+        if v: dialog['message_id'] = v
         return dialog
     
     @staticmethod
     def _analysis_from_db(row: Dict[str, Any]) -> Dict[str, Any]:
         """Convert database row to analysis dict."""
+        get = row.get
         analysis = {
             'type': row['type'],
             'vendor': row['vendor']
         }
         
         # Handle dialog indices (might be single value or array)
-        if row.get('dialog_indices'):
-            indices = row['dialog_indices']
-            analysis['dialog'] = indices[0] if len(indices) == 1 else indices
-        
-        if row.get('mediatype'): analysis['mediatype'] = row['mediatype']
-        if row.get('filename'): analysis['filename'] = row['filename']
-        if row.get('product'): analysis['product'] = row['product']
-        if row.get('schema'): analysis['schema'] = row['schema']
-        if row.get('body'): analysis['body'] = row['body']
-        if row.get('encoding'): analysis['encoding'] = row['encoding']
-        if row.get('url'): analysis['url'] = row['url']
-        if row.get('content_hash'): analysis['content_hash'] = row['content_hash']
+        v = get('dialog_indices')
+        if v: analysis['dialog'] = v[0] if len(v) == 1 else v
+        
+        v = get('mediatype')
+        if v: analysis['mediatype'] = v
+        v = get('filename')
+        if v: analysis['filename'] = v
+        v = get('product')
+        if v: analysis['product'] = v
+        v = get('schema')
+        if v: analysis['schema'] = v
+        v = get('body')
+        if v: analysis['body'] = v
+        v = get('encoding')
+        if v: analysis['encoding'] = v
+        v = get('url')
+        if v: analysis['url'] = v
+        v = get('content_hash')
+        if v: analysis['content_hash'] = v
         return analysis
     
     @staticmethod
     def _attachment_from_db(row: Dict[str, Any]) -> Dict[str, Any]:
         """Convert database row to attachment dict."""
+        get = row.get
         attachment = {}
-        if row.get('type'): attachment['type'] = row['type']
-        if row.get('start_time'): attachment['start'] = row['start_time']
-        if row.get('party') is not None: attachment['party'] = row['party']
-        if row.get('dialog') is not None: attachment['dialog'] = row['dialog']
-        if row.get('mimetype'): attachment['mediatype'] = row['mimetype']
-        if row.get('filename'): attachment['filename'] = row['filename']
-        if row.get('body'): attachment['body'] = row['body']
-        if row.get('encoding'): attachment['encoding'] = row['encoding']
-        if row.get('url'): attachment['url'] = row['url']
-        if row.get('content_hash'): attachment['content_hash'] = row['content_hash']
+        v = get('type')
+        if v: attachment['type'] = v
+        v = get('purpose')
+        if v: attachment['purpose'] = v
+        v = get('start_time')
+        if v: attachment['start'] = v
+        v = get('party')
+        if v is not None: attachment['party'] = v
+        v = get('dialog')
+        if v is not None: attachment['dialog'] = v
+        v = get('mimetype')
+        if v: attachment['mediatype'] = v
+        v = get('filename')
+        if v: attachment['filename'] = v
+        v = get('body')
+        if v: attachment['body'] = v
+        v = get('encoding')
+        if v: attachment['encoding'] = v
+        v = get('url')
+        if v: attachment['url'] = v
+        v = get('content_hash')
+        if v: attachment['content_hash'] = v
         return attachment
 
 
+class AsyncSupabaseStorage:
+    """
+    Asyncio variant of SupabaseStorage.
+    
+    Uses supabase-py's async client and redis.asyncio so a single event loop
+    can keep many saves and reads in flight at once. Row shaping and
+    conversion are shared with SupabaseStorage. Create instances with
+    ``await AsyncSupabaseStorage.create(options)``.
+    """
+    
+    def __init__(self, supabase: 'AsyncClient', redis_client, cache_ttl: int):
+        self.logger = logging.getLogger(__name__)
+        self.supabase = supabase
+        self._table = supabase.table
+        self._save_rpc_available = True
+        self._full_view_available = True
+        self.redis_client = redis_client
+        self.cache_enabled = redis_client is not None
+        self.cache_ttl = cache_ttl
+    
+    @classmethod
+    async def create(cls, options: Dict[str, Any]) -> 'AsyncSupabaseStorage':
+        """
+        Connect to Supabase (and optionally Redis) and build the storage.
+        
+        Args:
+            options: Same configuration dict as SupabaseStorage
+        """
+        if not ASYNC_SUPABASE_AVAILABLE:
+            raise ImportError("supabase-py with async support is required. Install with: pip install -U supabase")
+        
+        logger = logging.getLogger(__name__)
+        
+        url = options.get('url') or os.getenv('SUPABASE_URL')
+        key = options.get('anon_key') or os.getenv('SUPABASE_ANON_KEY')
+        
+        if not url or not key:
+            raise ValueError("SUPABASE_URL and SUPABASE_ANON_KEY are required")
+        
+        supabase = await acreate_client(url, key)
+        logger.info("✅ Connected to Supabase (async)")
+        
+        cache_ttl = int(options.get('cache_ttl', os.getenv('VCON_REDIS_EXPIRY', '3600')))
+        redis_client = None
+        
+        redis_url = options.get('redis_url') or os.getenv('REDIS_URL')
+        if redis_url and ASYNC_REDIS_AVAILABLE:
+            try:
+                pool = aioredis.BlockingConnectionPool.from_url(
+                    redis_url,
+                    max_connections=int(options.get('redis_max_connections', 32)),
+                    timeout=5,
+                    socket_connect_timeout=5,
+                    socket_timeout=5,
+                    socket_keepalive=True,
+                    socket_keepalive_options=_keepalive_options(),
+                )
+                redis_client = aioredis.Redis(connection_pool=pool)
+                await redis_client.ping()
+                logger.info(f"✅ Redis cache enabled (TTL: {cache_ttl}s)")
+            except Exception as e:
+                logger.warning(f"⚠️  Redis connection failed: {e}. Caching disabled.")
+                redis_client = None
+        else:
+            logger.info("ℹ️  Redis cache disabled (not configured)")
+        
+        return cls(supabase, redis_client, cache_ttl)
+    
+    async def save(self, vcon: Dict[str, Any]) -> bool:
+        """
+        Save a vCon to Supabase (and cache in Redis).
+        
+        Args:
+            vcon: vCon dictionary
+            
+        Returns:
+            bool: True if save succeeded
+        """
+        try:
+            uuid = vcon.get('uuid')
+            if not uuid:
+                raise ValueError("vCon must have a uuid field")
+            
+            await self._save_to_supabase(vcon)
+            self.logger.info("✅ Saved vCon %s to Supabase", uuid)
+            
+            await self._cache_many([vcon])
+            return True
+            
+        except Exception as e:
+            self.logger.error("❌ Failed to save vCon: %s", e)
+            return False
+    
+    async def get(self, uuid: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a vCon by UUID (cache-first strategy).
+        
+        Args:
+            uuid: vCon UUID
+            
+        Returns:
+            Dict or None if not found
+        """
+        if self.cache_enabled:
+            try:
+                cached = await self.redis_client.get(CACHE_KEY_PREFIX + uuid)
+                if cached:
+                    self.logger.debug("Cache HIT for vCon %s", uuid)
+                    return _decode_cache_value(cached)
+                self.logger.debug("Cache MISS for vCon %s", uuid)
+            except Exception as e:
+                self.logger.warning("⚠️  Cache read error for %s: %s", uuid, e)
+        
+        try:
+            result = await (
+                self._table('vcons')
+                .select(VCON_EMBED_SELECT)
+                .eq('uuid', uuid)
+                .single()
+                .execute()
+            )
+            
+            if not result.data:
+                return None
+            
+            vcon = SupabaseStorage._vcon_from_db(result.data)
+            
+            await self._cache_many([vcon])
+            return vcon
+            
+        except Exception as e:
+            self.logger.error("❌ Failed to get vCon %s: %s", uuid, e)
+            return None
+    
+    async def delete(self, uuid: str) -> bool:
+        """
+        Delete a vCon from Supabase and cache.
+        
+        Args:
+            uuid: vCon UUID
+            
+        Returns:
+            bool: True if delete succeeded
+        """
+        try:
+            await self._table('vcons').delete().eq('uuid', uuid).execute()
+            
+            if self.cache_enabled:
+                try:
+                    await self.redis_client.unlink(CACHE_KEY_PREFIX + uuid)
+                except Exception as e:
+                    self.logger.warning("⚠️  Failed to invalidate cache for %s: %s", uuid, e)
+            
+            self.logger.info("✅ Deleted vCon %s", uuid)
+            return True
+            
+        except Exception as e:
+            self.logger.error("❌ Failed to delete vCon %s: %s", uuid, e)
+            return False
+    
+    async def search(self, query: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Search vCons by criteria, reading documents from vcons_full.
+        
+        Args:
+            query: Search criteria dict
+            
+        Returns:
+            List of matching vCons
+        """
+        try:
+            vcons = await self._search_vcons(query)
+            await self._cache_many(vcons)
+            return vcons
+            
+        except Exception as e:
+            self.logger.error("❌ Search failed: %s", e)
+            return []
+    
+    async def _search_vcons(self, query: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Run a search against vcons_full, falling back to an embedded select."""
+        if self._full_view_available:
+            try:
+                result = await _apply_search_filters(self._table('vcons_full').select('vcon'), query).execute()
+                return [row['vcon'] for row in result.data]
+            except APIError as e:
+                if e.code not in _MISSING_RELATION_CODES:
+                    raise
+                self._full_view_available = False
+                self.logger.warning("⚠️  vcons_full view not found; falling back to embedded selects")
+        
+        result = await _apply_search_filters(self._table('vcons').select(VCON_EMBED_SELECT), query).execute()
+        return [SupabaseStorage._vcon_from_db(row) for row in result.data]
+    
+    async def _cache_many(self, vcons: List[Dict[str, Any]]):
+        """Write vCons to the Redis cache in a single pipelined round trip."""
+        if not (self.cache_enabled and vcons):
+            return
+        try:
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                for vcon in vcons:
+                    pipe.setex(CACHE_KEY_PREFIX + vcon['uuid'], self.cache_ttl, _encode_cache_value(vcon))
+                await pipe.execute()
+        except Exception as e:
+            # Non-fatal: continue without caching
+            self.logger.warning("⚠️  Failed to cache %s vCon(s): %s", len(vcons), e)
+    
+    async def _save_to_supabase(self, vcon: Dict[str, Any]) -> None:
+        """Write a vCon via the save_vcon RPC, falling back to per-table upserts."""
+        if self._save_rpc_available:
+            try:
+                await self.supabase.rpc('save_vcon', {'payload': vcon}).execute()
+                return
+            except APIError as e:
+                if e.code != 'PGRST202':
+                    raise
+                self._save_rpc_available = False
+                self.logger.warning("⚠️  save_vcon RPC not found; falling back to per-table upserts")
+        
+        vcon_id = vcon['uuid']
+        row = SupabaseStorage._vcon_upsert_row(vcon)
+        
+        # Insert, or update an existing row without touching its id
+        inserted = await self._table('vcons').upsert(
+            row, on_conflict='uuid', ignore_duplicates=True,
+            returning=ReturnMethod.minimal, count=CountMethod.exact,
+        ).execute()
+        if not inserted.count:
+            del row['id']
+            await self._table('vcons').update(row, returning=ReturnMethod.minimal).eq('uuid', vcon_id).execute()
+        
+        # Child tables only depend on the parent row, not on each other
+        writes = []
+        for table, index_column, build_rows in (
+            ('parties', 'party_index', SupabaseStorage._party_rows),
+            ('dialog', 'dialog_index', SupabaseStorage._dialog_rows),
+            ('analysis', 'analysis_index', SupabaseStorage._analysis_rows),
+            ('attachments', 'attachment_index', SupabaseStorage._attachment_rows),
+        ):
+            if vcon.get(table):
+                rows = build_rows(vcon_id, vcon[table])
+                writes.append(self._table(table).upsert(
+                    rows, on_conflict=f'vcon_id,{index_column}', returning=ReturnMethod.minimal
+                ).execute())
+        await asyncio.gather(*writes)
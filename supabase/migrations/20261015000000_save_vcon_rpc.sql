@@ -0,0 +1,216 @@
+-- Single-call, transactional vCon write path.
+--
+-- save_vcon(payload) takes a complete vCon document as JSONB and upserts the
+-- vcons row plus its parties, dialog, analysis and attachments rows inside the
+-- caller's transaction, so a save is one PostgREST request and either lands
+-- completely or not at all. Row shaping mirrors src/db/batch-writer.ts:
+--   - vcons.id = vcons.uuid, and child vcon_id references vcons(uuid)
+--   - start -> start_time, duration -> duration_seconds
+--   - analysis.dialog -> dialog_indices, attachment mediatype -> mimetype
+--   - critical/amended accept the pre-0.4.0 must_support/appended names
+--   - created_at is only replaced when the payload carries one
+-- Child rows are upserted on (vcon_id, <entity>_index), matching the
+-- per-table upserts this replaces.
+
+-- Normalize a JSON number or array of numbers to an integer array.
+CREATE OR REPLACE FUNCTION vcon_jsonb_int_array(value jsonb)
+RETURNS int[] AS $$
+  SELECT CASE jsonb_typeof(value)
+    WHEN 'array'  THEN ARRAY(SELECT jsonb_array_elements_text(value)::int)
+    WHEN 'number' THEN ARRAY[(value #>> '{}')::int]
+    ELSE NULL
+  END;
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Convert a JSON array of strings to a text array (NULL for anything else).
+CREATE OR REPLACE FUNCTION vcon_jsonb_text_array(value jsonb)
+RETURNS text[] AS $$
+  SELECT CASE jsonb_typeof(value)
+    WHEN 'array' THEN ARRAY(SELECT jsonb_array_elements_text(value))
+    ELSE NULL
+  END;
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION save_vcon(payload jsonb)
+RETURNS uuid AS $$
+DECLARE
+  v_uuid uuid;
+BEGIN
+  v_uuid := (payload->>'uuid')::uuid;
+  IF v_uuid IS NULL THEN
+    RAISE EXCEPTION 'vCon must have a uuid field';
+  END IF;
+
+  INSERT INTO vcons (
+    id, uuid, vcon_version, subject, created_at, updated_at,
+    extensions, critical, redacted, amended
+  ) VALUES (
+    v_uuid,
+    v_uuid,
+    COALESCE(payload->>'vcon', '0.4.0'),
+    payload->>'subject',
+    COALESCE((payload->>'created_at')::timestamptz, now()),
+    COALESCE((payload->>'updated_at')::timestamptz, now()),
+    vcon_jsonb_text_array(payload->'extensions'),
+    vcon_jsonb_text_array(COALESCE(payload->'critical', payload->'must_support')),
+    COALESCE(payload->'redacted', '{}'::jsonb),
+    COALESCE(payload->'amended', payload->'appended', '{}'::jsonb)
+  )
+  ON CONFLICT (uuid) DO UPDATE SET
+    vcon_version = EXCLUDED.vcon_version,
+    subject      = EXCLUDED.subject,
+    created_at   = COALESCE((payload->>'created_at')::timestamptz, vcons.created_at),
+    updated_at   = EXCLUDED.updated_at,
+    extensions   = EXCLUDED.extensions,
+    critical     = EXCLUDED.critical,
+    redacted     = EXCLUDED.redacted,
+    amended      = EXCLUDED.amended;
+
+  INSERT INTO parties (
+    vcon_id, party_index, tel, sip, stir, mailto, name, did, uuid,
+    validation, jcard, gmlpos, civicaddress, timezone
+  )
+  SELECT
+    v_uuid,
+    (p.idx - 1)::int,
+    p.value->>'tel',
+    p.value->>'sip',
+    p.value->>'stir',
+    p.value->>'mailto',
+    p.value->>'name',
+    p.value->>'did',
+    p.value->>'uuid',
+    p.value->>'validation',
+    p.value->'jcard',
+    p.value->>'gmlpos',
+    p.value->'civicaddress',
+    p.value->>'timezone'
+  FROM jsonb_array_elements(COALESCE(payload->'parties', '[]'::jsonb)) WITH ORDINALITY AS p(value, idx)
+  ON CONFLICT (vcon_id, party_index) DO UPDATE SET
+    tel          = EXCLUDED.tel,
+    sip          = EXCLUDED.sip,
+    stir         = EXCLUDED.stir,
+    mailto       = EXCLUDED.mailto,
+    name         = EXCLUDED.name,
+    did          = EXCLUDED.did,
+    uuid         = EXCLUDED.uuid,
+    validation   = EXCLUDED.validation,
+    jcard        = EXCLUDED.jcard,
+    gmlpos       = EXCLUDED.gmlpos,
+    civicaddress = EXCLUDED.civicaddress,
+    timezone     = EXCLUDED.timezone;
+
+  INSERT INTO dialog (
+    vcon_id, dialog_index, type, start_time, duration_seconds, parties,
+    originator, mediatype, filename, body, encoding, url, content_hash,
+    disposition, session_id, application, message_id
+  )
+  SELECT
+    v_uuid,
+    (d.idx - 1)::int,
+    d.value->>'type',
+    (d.value->>'start')::timestamptz,
+    (d.value->>'duration')::real,
+    vcon_jsonb_int_array(d.value->'parties'),
+    (d.value->>'originator')::int,
+    d.value->>'mediatype',
+    d.value->>'filename',
+    d.value->>'body',
+    d.value->>'encoding',
+    d.value->>'url',
+    d.value->>'content_hash',
+    d.value->>'disposition',
+    d.value->'session_id',
+    d.value->>'application',
+    d.value->>'message_id'
+  FROM jsonb_array_elements(COALESCE(payload->'dialog', '[]'::jsonb)) WITH ORDINALITY AS d(value, idx)
+  ON CONFLICT (vcon_id, dialog_index) DO UPDATE SET
+    type             = EXCLUDED.type,
+    start_time       = EXCLUDED.start_time,
+    duration_seconds = EXCLUDED.duration_seconds,
+    parties          = EXCLUDED.parties,
+    originator       = EXCLUDED.originator,
+    mediatype        = EXCLUDED.mediatype,
+    filename         = EXCLUDED.filename,
+    body             = EXCLUDED.body,
+    encoding         = EXCLUDED.encoding,
+    url              = EXCLUDED.url,
+    content_hash     = EXCLUDED.content_hash,
+    disposition      = EXCLUDED.disposition,
+    session_id       = EXCLUDED.session_id,
+    application      = EXCLUDED.application,
+    message_id       = EXCLUDED.message_id;
+
+  -- ->> returns object/array bodies as JSON text, matching serializeBody()
+  INSERT INTO analysis (
+    vcon_id, analysis_index, type, dialog_indices, mediatype, filename,
+    vendor, product, schema, body, encoding, url, content_hash
+  )
+  SELECT
+    v_uuid,
+    (a.idx - 1)::int,
+    a.value->>'type',
+    vcon_jsonb_int_array(a.value->'dialog'),
+    a.value->>'mediatype',
+    a.value->>'filename',
+    a.value->>'vendor',
+    a.value->>'product',
+    a.value->>'schema',
+    a.value->>'body',
+    a.value->>'encoding',
+    a.value->>'url',
+    a.value->>'content_hash'
+  FROM jsonb_array_elements(COALESCE(payload->'analysis', '[]'::jsonb)) WITH ORDINALITY AS a(value, idx)
+  ON CONFLICT (vcon_id, analysis_index) DO UPDATE SET
+    type           = EXCLUDED.type,
+    dialog_indices = EXCLUDED.dialog_indices,
+    mediatype      = EXCLUDED.mediatype,
+    filename       = EXCLUDED.filename,
+    vendor         = EXCLUDED.vendor,
+    product        = EXCLUDED.product,
+    schema         = EXCLUDED.schema,
+    body           = EXCLUDED.body,
+    encoding       = EXCLUDED.encoding,
+    url            = EXCLUDED.url,
+    content_hash   = EXCLUDED.content_hash;
+
+  INSERT INTO attachments (
+    vcon_id, attachment_index, type, purpose, start_time, party, dialog,
+    mimetype, filename, body, encoding, url, content_hash
+  )
+  SELECT
+    v_uuid,
+    (t.idx - 1)::int,
+    t.value->>'type',
+    t.value->>'purpose',
+    (t.value->>'start')::timestamptz,
+    (t.value->>'party')::int,
+    (t.value->>'dialog')::int,
+    t.value->>'mediatype',
+    t.value->>'filename',
+    t.value->>'body',
+    t.value->>'encoding',
+    t.value->>'url',
+    t.value->>'content_hash'
+  FROM jsonb_array_elements(COALESCE(payload->'attachments', '[]'::jsonb)) WITH ORDINALITY AS t(value, idx)
+  ON CONFLICT (vcon_id, attachment_index) DO UPDATE SET
+    type         = EXCLUDED.type,
+    purpose      = EXCLUDED.purpose,
+    start_time   = EXCLUDED.start_time,
+    party        = EXCLUDED.party,
+    dialog       = EXCLUDED.dialog,
+    mimetype     = EXCLUDED.mimetype,
+    filename     = EXCLUDED.filename,
+    body         = EXCLUDED.body,
+    encoding     = EXCLUDED.encoding,
+    url          = EXCLUDED.url,
+    content_hash = EXCLUDED.content_hash;
+
+  RETURN v_uuid;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON FUNCTION save_vcon(jsonb) IS
+  'Upsert a complete vCon (vcons row plus parties, dialog, analysis and attachments) in one transaction. Returns the vCon uuid.';
+
+GRANT EXECUTE ON FUNCTION save_vcon(jsonb) TO anon, authenticated, service_role;
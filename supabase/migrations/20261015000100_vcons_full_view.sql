@@ -0,0 +1,134 @@
+-- Server-side vCon document assembly.
+--
+-- vcons_full exposes each vCon as a single JSONB document (column `vcon`)
+-- built with jsonb_build_object/jsonb_agg, so a search is one query with no
+-- client-side reassembly of child rows. The filterable vcons columns (uuid,
+-- subject, created_at, updated_at) are passed through for PostgREST filters.
+--
+-- The document matches what the conserver storage example builds from a
+-- vcons row with embedded children:
+--   - start_time -> start, duration_seconds -> duration,
+--     attachment mimetype -> mediatype
+--   - analysis.dialog_indices -> dialog (a scalar when it has one element)
+--   - critical/amended come from the critical/amended columns
+--   - dialog type and analysis type/vendor are always present (possibly
+--     null); other empty/NULL fields are omitted; children keep array order
+-- Child rows join on vcons.uuid (see 20260527230000_vcons_fks_target_uuid).
+--
+-- security_invoker keeps RLS on the underlying tables in force for callers.
+
+-- Drop top-level keys whose value is JSON null. Unlike jsonb_strip_nulls this
+-- does not recurse, so nulls inside jcard, civicaddress etc. are preserved.
+CREATE OR REPLACE FUNCTION vcon_jsonb_strip_nulls(value jsonb)
+RETURNS jsonb AS $$
+  SELECT COALESCE(jsonb_object_agg(e.key, e.value), '{}'::jsonb)
+  FROM jsonb_each(value) AS e
+  WHERE jsonb_typeof(e.value) <> 'null';
+$$ LANGUAGE sql IMMUTABLE;
+
+-- NULL for JSON values Python treats as empty ({}, [], "", 0, false, null).
+CREATE OR REPLACE FUNCTION vcon_jsonb_nullif_empty(value jsonb)
+RETURNS jsonb AS $$
+  SELECT CASE
+    WHEN value IN ('{}'::jsonb, '[]'::jsonb, '""'::jsonb, '0'::jsonb, 'false'::jsonb, 'null'::jsonb) THEN NULL
+    ELSE value
+  END;
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE VIEW vcons_full WITH (security_invoker = true) AS
+SELECT
+  v.uuid,
+  v.subject,
+  v.created_at,
+  v.updated_at,
+  jsonb_build_object(
+    'vcon', v.vcon_version,
+    'uuid', v.uuid,
+    'created_at', v.created_at,
+    'updated_at', v.updated_at,
+    'subject', v.subject,
+    'extensions', v.extensions,
+    'critical', v.critical,
+    'redacted', v.redacted,
+    'amended', v.amended,
+    'parties', COALESCE((
+      SELECT jsonb_agg(vcon_jsonb_strip_nulls(jsonb_build_object(
+        'tel', NULLIF(p.tel, ''),
+        'sip', NULLIF(p.sip, ''),
+        'stir', NULLIF(p.stir, ''),
+        'mailto', NULLIF(p.mailto, ''),
+        'name', NULLIF(p.name, ''),
+        'did', NULLIF(p.did, ''),
+        'uuid', NULLIF(p.uuid, ''),
+        'validation', NULLIF(p.validation, ''),
+        'jcard', vcon_jsonb_nullif_empty(p.jcard),
+        'gmlpos', NULLIF(p.gmlpos, ''),
+        'civicaddress', vcon_jsonb_nullif_empty(p.civicaddress),
+        'timezone', NULLIF(p.timezone, '')
+      )) ORDER BY p.party_index)
+      FROM parties p
+      WHERE p.vcon_id = v.uuid
+    ), '[]'::jsonb),
+    'dialog', COALESCE((
+      SELECT jsonb_agg(jsonb_build_object('type', d.type) || vcon_jsonb_strip_nulls(jsonb_build_object(
+        'start', d.start_time,
+        'duration', d.duration_seconds,
+        'parties', NULLIF(d.parties, '{}'),
+        'originator', d.originator,
+        'mediatype', NULLIF(d.mediatype, ''),
+        'filename', NULLIF(d.filename, ''),
+        'body', NULLIF(d.body, ''),
+        'encoding', NULLIF(d.encoding, ''),
+        'url', NULLIF(d.url, ''),
+        'content_hash', NULLIF(d.content_hash, ''),
+        'disposition', NULLIF(d.disposition, ''),
+        'session_id', vcon_jsonb_nullif_empty(d.session_id),
+        'application', NULLIF(d.application, ''),
+        'message_id', NULLIF(d.message_id, '')
+      )) ORDER BY d.dialog_index)
+      FROM dialog d
+      WHERE d.vcon_id = v.uuid
+    ), '[]'::jsonb),
+    'analysis', COALESCE((
+      SELECT jsonb_agg(jsonb_build_object('type', a.type, 'vendor', a.vendor) || vcon_jsonb_strip_nulls(jsonb_build_object(
+        'dialog', CASE cardinality(a.dialog_indices)
+                    WHEN 0 THEN NULL
+                    WHEN 1 THEN to_jsonb(a.dialog_indices[1])
+                    ELSE to_jsonb(a.dialog_indices)
+                  END,
+        'mediatype', NULLIF(a.mediatype, ''),
+        'filename', NULLIF(a.filename, ''),
+        'product', NULLIF(a.product, ''),
+        'schema', NULLIF(a.schema, ''),
+        'body', NULLIF(a.body, ''),
+        'encoding', NULLIF(a.encoding, ''),
+        'url', NULLIF(a.url, ''),
+        'content_hash', NULLIF(a.content_hash, '')
+      )) ORDER BY a.analysis_index)
+      FROM analysis a
+      WHERE a.vcon_id = v.uuid
+    ), '[]'::jsonb),
+    'attachments', COALESCE((
+      SELECT jsonb_agg(vcon_jsonb_strip_nulls(jsonb_build_object(
+        'type', NULLIF(t.type, ''),
+        'purpose', NULLIF(t.purpose, ''),
+        'start', t.start_time,
+        'party', t.party,
+        'dialog', t.dialog,
+        'mediatype', NULLIF(t.mimetype, ''),
+        'filename', NULLIF(t.filename, ''),
+        'body', NULLIF(t.body, ''),
+        'encoding', NULLIF(t.encoding, ''),
+        'url', NULLIF(t.url, ''),
+        'content_hash', NULLIF(t.content_hash, '')
+      )) ORDER BY t.attachment_index)
+      FROM attachments t
+      WHERE t.vcon_id = v.uuid
+    ), '[]'::jsonb)
+  ) AS vcon
+FROM vcons v;
+
+COMMENT ON VIEW vcons_full IS
+  'Each vCon as one JSONB document (vcons row plus parties, dialog, analysis and attachments), for single-query reads.';
+
+GRANT SELECT ON vcons_full TO anon, authenticated, service_role;